@@ -1,7 +1,11 @@
 import sys
+from aocd12 import count_zeros_in_file, count_zeros_parallel
 
-def calculate_password_from_file(filename):
+def calculate_password_from_file(filename, vectorized=False, verbose=False, parallel=False):
     """Calculate password from rotations in a file"""
+    if vectorized or parallel:
+        return vectorized_file_calculation(filename, verbose, parallel)
+    
     try:
         with open(filename, 'r') as file:
             rotations = [line.strip() for line in file if line.strip()]
@@ -66,11 +70,16 @@ def main():
     print("SAFE DIAL PASSWORD CALCULATOR (File Input)")
     print("=" * 60)
     
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    vectorized = '--vectorized' in sys.argv
+    verbose = '--verbose' in sys.argv
+    parallel = '--parallel' in sys.argv
+    
     # Check if filename provided as command line argument
-    if len(sys.argv) > 1:
-        filename = sys.argv[1]
+    if args:
+        filename = args[0]
         print(f"Using file: {filename}")
-        calculate_password_from_file(filename)
+        calculate_password_from_file(filename, vectorized, verbose, parallel)
     else:
         # Ask user for filename
         filename = input("\nEnter the filename containing rotations: ").strip()
@@ -79,7 +88,7 @@ def main():
             print("No filename provided. Exiting.")
             return
         
-        calculate_password_from_file(filename)
+        calculate_password_from_file(filename, vectorized, verbose, parallel)
 
 # Alternative: Simple file reading without verbose output
 def simple_file_calculation(filename):
@@ -116,5 +125,36 @@ def simple_file_calculation(filename):
         print(f"File '{filename}' not found")
         return None
 
+# Alternative: NumPy batch version for very large rotation files
+def vectorized_file_calculation(filename, verbose=False, parallel=False):
+    """Vectorized version; prints per-step lines only when verbose.
+    With parallel=True the file is split into chunks summarized on a
+    process pool (no per-step output).
+    
+    Note: this path tokenizes the raw bytes (parse_rotation_deltas), not
+    lines. A rotation is an L/R letter (either case) immediately followed
+    by digits, wherever it appears; anything else is ignored without a
+    warning. So 'R 5' is dropped here (the default mode reads it as 5)
+    and 'R5x' counts as 5 (the default mode skips it)."""
+    try:
+        if parallel:
+            zero_count, passed_zero = count_zeros_parallel(filename)
+        else:
+            zero_count, passed_zero = count_zeros_in_file(filename, verbose=verbose)
+    except FileNotFoundError:
+        print(f"File '{filename}' not found")
+        return None
+    except PermissionError:
+        print(f"Error: Permission denied to read '{filename}'")
+        return None
+    except Exception as e:
+        print(f"Error reading file: {e}")
+        return None
+    
+    print(f"Times dial pointed to 0: {zero_count}")
+    print(f"Times dial passed through 0: {passed_zero}")
+    print(f"Password: {zero_count}")
+    return zero_count
+
 if __name__ == "__main__":
     main()
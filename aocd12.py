@@ -1,60 +1,365 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
+import os
 import sys
+import random
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
 
-def count_zeros_in_rotation(start, direction, degrees):
- """
- Count ALL times the dial points at 0 during a rotation.
- This includes both during the movement AND at the final position.
- 
- For k from 1 to degrees:
- - If direction == 'R': position = (start + k) % 100
- - If direction == 'L': position = (start - k) % 100
- Count how many times position == 0.
- """
+def count_zeros_in_rotation(start, direction, degrees, dial_size=100):
+    """
+    Count ALL times the dial points at 0 during a rotation.
+    This includes both during the movement AND at the final position.
+    
+    For k from 1 to degrees:
+    - If direction == 'R': position = (start + k) % dial_size
+    - If direction == 'L': position = (start - k) % dial_size
+    Count how many times position == 0.
+    
+    Zeros are the multiples of dial_size in the swept interval, so the
+    count is a difference of two floor divisions (O(1) in degrees).
+    """
+    start %= dial_size
+    
+    if direction == 'L':
+        # Multiples of dial_size in [start - degrees, start - 1]
+        count = (start - 1) // dial_size - (start - degrees - 1) // dial_size
+        new_pos = (start - degrees) % dial_size
+    else:
+        # Multiples of dial_size in [start + 1, start + degrees]
+        count = (start + degrees) // dial_size
+        new_pos = (start + degrees) % dial_size
+    
+    return new_pos, count
+
+class DialState:
+    """Incremental Day 1 dial for live rotation feeds (O(1) per rotation)."""
+    def __init__(self, position=50, dial_size=100):
+        self.dial_size = dial_size
+        self.position = position % dial_size
+        self.final_zeros = 0    # rotations ending on 0 (part 1)
+        self.passed_zeros = 0   # every click landing on 0 (part 2)
+        self.rotations = 0
+    
+    def rotate(self, direction, distance):
+        """Apply one rotation, return (new_position, zeros passed)."""
+        direction = direction.upper()
+        if direction not in ('L', 'R'):
+            raise ValueError(f"Invalid direction '{direction}'")
+        new_pos, zeros = count_zeros_in_rotation(self.position, direction,
+                                                 distance, self.dial_size)
+        self.position = new_pos
+        self.passed_zeros += zeros
+        if new_pos == 0:
+            self.final_zeros += 1
+        self.rotations += 1
+        return new_pos, zeros
+    
+    def rotate_many(self, rotations):
+        """Apply an iterable of (direction, distance) pairs."""
+        for direction, distance in rotations:
+            self.rotate(direction, distance)
+        return self.position
+    
+    def snapshot(self):
+        """Return the full state as a plain tuple."""
+        return (self.position, self.dial_size, self.final_zeros,
+                self.passed_zeros, self.rotations)
+    
+    def restore(self, snapshot):
+        """Reset the state from a tuple produced by snapshot()."""
+        (self.position, self.dial_size, self.final_zeros,
+         self.passed_zeros, self.rotations) = snapshot
+
+def _count_zeros_in_rotation_loop(start, direction, degrees, dial_size=100):
+    """Original step-by-100 version, kept as a reference for --verify."""
     count = 0
     
     if direction == 'L':
-        k0 = start if start > 0 else 100
+        k0 = start if start > 0 else dial_size
         while k0 <= degrees:
             count += 1
-            k0 += 100
-        new_pos = (start - degrees) % 100
+            k0 += dial_size
+        new_pos = (start - degrees) % dial_size
     else:
-        k0 = (100 - start) % 100
+        k0 = (dial_size - start) % dial_size
         if k0 == 0:
-            k0 = 100
+            k0 = dial_size
         while k0 <= degrees:
             count += 1
-            k0 += 100
-        new_pos = (start + degrees) % 100
+            k0 += dial_size
+        new_pos = (start + degrees) % dial_size
     
     return new_pos, count
 
+def verify_count_zeros(trials=100000, seed=0):
+    """Differential check of count_zeros_in_rotation against the loop."""
+    rng = random.Random(seed)
+    for _ in range(trials):
+        dial_size = rng.choice((1, 2, 7, 100, rng.randint(1, 1000)))
+        start = rng.randrange(dial_size)
+        direction = rng.choice('LR')
+        degrees = rng.randint(0, 50 * dial_size)
+        expected = _count_zeros_in_rotation_loop(start, direction, degrees, dial_size)
+        got = count_zeros_in_rotation(start, direction, degrees, dial_size)
+        if got != expected:
+            print(f"MISMATCH: start={start} {direction}{degrees} dial={dial_size}: "
+                  f"{got} != {expected}")
+            return False
+    print(f"count_zeros_in_rotation matches loop on {trials} random rotations")
+    return True
+
+def parse_rotation_deltas(data):
+    """
+    Parse raw rotation bytes into a signed int64 array of deltas
+    (L -> negative, R -> positive), without a Python loop per rotation.
+    
+    Follows the same rules as the tokenizer in main(): a rotation is an
+    L/R letter (either case) immediately followed by one or more digits.
+    Raises ValueError if a distance is too large for int64.
+    """
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if buf.size == 0:
+        return np.zeros(0, dtype=np.int64)
+    
+    is_digit = (buf >= ord('0')) & (buf <= ord('9'))
+    prev_digit = np.concatenate(([False], is_digit[:-1]))
+    next_digit = np.concatenate((is_digit[1:], [False]))
+    run_starts = np.flatnonzero(is_digit & ~prev_digit)
+    run_ends = np.flatnonzero(is_digit & ~next_digit)
+    
+    # Keep only digit runs that directly follow a direction letter
+    letters = buf[np.maximum(run_starts - 1, 0)] | 0x20  # lowercase
+    keep = (run_starts > 0) & ((letters == ord('l')) | (letters == ord('r')))
+    run_starts = run_starts[keep]
+    run_ends = run_ends[keep]
+    letters = letters[keep]
+    
+    # Horner's rule over digit positions, one vectorized pass per digit
+    lengths = run_ends - run_starts + 1
+    values = np.zeros(run_starts.size, dtype=np.int64)
+    limit = (np.iinfo(np.int64).max - 9) // 10
+    for j in range(int(lengths.max()) if lengths.size else 0):
+        active = lengths > j
+        if (values[active] > limit).any():
+            bad = run_starts[active][values[active] > limit][0]
+            raise ValueError(f"Rotation distance at byte {bad} does not fit in int64; "
+                             f"use iter_rotations for exact values")
+        values[active] = values[active] * 10 + (buf[run_starts[active] + j] - ord('0'))
+    
+    return np.where(letters == ord('l'), -values, values)
+
+def _exact_sum(values):
+    """
+    Sum a non-negative int64 array as a Python int without overflow:
+    the high and low 32-bit halves are summed separately.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    return (int((values >> 32).sum()) << 32) + int((values & 0xFFFFFFFF).sum())
+
+def count_zeros_vectorized(deltas, start=50, dial_size=100, verbose=False):
+    """
+    Vectorized Day 1 counter over an array of signed deltas.
+    Returns (final_zero_hits, pass_through_zeros):
+    - final_zero_hits: rotations that end on 0 (part 1)
+    - pass_through_zeros: every click that lands on 0 (part 2)
+    
+    Each delta is split into |delta| // d full laps (one zero each,
+    summed exactly) and a partial turn below d. The partial turns use
+    the unwrapped position P = start + cumsum(turns); a right turn from
+    P0 to P1 passes floor(P1/d) - floor(P0/d) zeros, a left turn
+    floor((P0-1)/d) - floor((P1-1)/d).
+    """
+    deltas = np.asarray(deltas, dtype=np.int64)
+    if deltas.size == 0:
+        return 0, 0
+    
+    magnitude = np.abs(deltas)
+    laps = _exact_sum(magnitude // dial_size)
+    turns = np.where(deltas >= 0, 1, -1) * (magnitude % dial_size)
+    
+    ends = start + np.cumsum(turns)
+    begins = np.concatenate(([start], ends[:-1]))
+    positions = ends % dial_size
+    
+    right = (ends // dial_size) - (begins // dial_size)
+    left = ((begins - 1) // dial_size) - ((ends - 1) // dial_size)
+    zeros = np.where(deltas >= 0, right, left)
+    
+    if verbose:
+        for step, (delta, pos, new_pos) in enumerate(
+                zip(deltas.tolist(), (begins % dial_size).tolist(), positions.tolist()), 1):
+            d = 'L' if delta < 0 else 'R'
+            marker = " (ZERO!)" if new_pos == 0 else ""
+            print(f"Step {step:3}: {d}{abs(delta):<4}    | {pos:3} -> {new_pos:3}{marker}")
+    
+    return int(np.count_nonzero(positions == 0)), laps + int(zeros.sum())
+
+def count_zeros_in_file(filename, start=50, dial_size=100, verbose=False):
+    """Read a rotation file and run count_zeros_vectorized on it."""
+    with open(filename, 'rb') as f:
+        deltas = parse_rotation_deltas(f.read())
+    return count_zeros_vectorized(deltas, start, dial_size, verbose)
+
+def summarize_deltas(deltas, dial_size=100):
+    """
+    Summarize a run of rotations as tables indexed by start position.
+    Returns (ends, zeros, hits), each of length dial_size:
+    - ends[s]: position after the run when starting from s
+    - zeros[s]: pass-through zeros when starting from s
+    - hits[s]: rotations ending on 0 when starting from s
+    
+    Built in O(n + dial_size): each rotation contributes |delta| // d
+    full laps for every start, plus one extra zero for the cyclic range
+    of starts whose partial turn crosses 0 (added via a difference array).
+    """
+    deltas = np.asarray(deltas, dtype=np.int64)
+    d = dial_size
+    # Only positions mod d are needed, so reduce before summing
+    steps = deltas % d
+    offset = int(steps.sum()) if deltas.size else 0
+    ends = (np.arange(d, dtype=np.int64) + offset) % d
+    
+    prefix = np.cumsum(steps) % d
+    before = np.concatenate(([0], prefix[:-1]))
+    rem = np.abs(deltas) % d
+    laps = _exact_sum(np.abs(deltas) // d)
+    
+    # Extra zero when the partial turn crosses 0: for R the in-dial start
+    # p must lie in [d-rem, d-1], for L in [1, rem]; shift by -before.
+    first = np.where(deltas >= 0, d - rem, 1)
+    first = (first - before) % d
+    first, rem = first[rem > 0], rem[rem > 0]
+    last = first + rem
+    wrapped = last > d
+    diff = (np.bincount(first, minlength=d + 1)
+            - np.bincount(np.minimum(last, d), minlength=d + 1)
+            + np.bincount(np.zeros(np.count_nonzero(wrapped), dtype=np.int64),
+                          minlength=d + 1)
+            - np.bincount(last[wrapped] - d, minlength=d + 1))
+    # Object dtype: the lap total may not fit in int64
+    zeros = np.cumsum(diff)[:d].astype(object) + laps
+    
+    # Rotation i ends on 0 from start s when s == -prefix[i] (mod d)
+    hits = np.bincount((-prefix) % d, minlength=d)
+    
+    return ends, zeros, hits
+
+def summarize_chunk(filename, begin, end, dial_size=100):
+    """Read bytes [begin, end) of a rotation file and summarize them."""
+    with open(filename, 'rb') as f:
+        f.seek(begin)
+        deltas = parse_rotation_deltas(f.read(end - begin))
+    return summarize_deltas(deltas, dial_size)
+
+def split_on_lines(filename, chunk_bytes):
+    """Split a file into (begin, end) byte ranges that end on a newline."""
+    size = os.path.getsize(filename)
+    bounds = [0]
+    with open(filename, 'rb') as f:
+        while bounds[-1] < size:
+            f.seek(min(bounds[-1] + chunk_bytes, size))
+            f.readline()
+            bounds.append(min(f.tell(), size))
+    return list(zip(bounds[:-1], bounds[1:]))
+
+def count_zeros_parallel(filename, start=50, dial_size=100, workers=None,
+                         chunk_bytes=64 * 1024 * 1024):
+    """
+    Process-pool version of count_zeros_in_file for very large inputs.
+    Each worker summarizes one line-aligned chunk; the start-position
+    tables are then composed in file order. Returns the same
+    (final_zero_hits, pass_through_zeros) pair.
+    """
+    chunks = split_on_lines(filename, chunk_bytes)
+    pos = start % dial_size
+    hits = 0
+    total = 0
+    
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        summaries = pool.map(summarize_chunk,
+                             [filename] * len(chunks),
+                             [b for b, _ in chunks],
+                             [e for _, e in chunks],
+                             [dial_size] * len(chunks))
+        for ends, zeros, chunk_hits in summaries:
+            hits += int(chunk_hits[pos])
+            total += int(zeros[pos])
+            pos = int(ends[pos])
+    
+    return hits, total
+
+ROTATION_RE = re.compile(rb'([LRlr])([0-9]+)')
+
+def iter_rotations(filename, block_size=1 << 20):
+    """
+    Stream (direction, distance) pairs from a rotation file.
+    Reads fixed-size binary blocks and scans them with a compiled bytes
+    regex, so memory stays at one block regardless of file size. A token
+    cut at a block boundary is carried over into the next block.
+    """
+    carry = b''
+    with open(filename, 'rb') as f:
+        while True:
+            block = f.read(block_size)
+            if not block:
+                break
+            data = carry + block
+            # Hold back only the last token, which may continue in the
+            # next block: trailing digits plus at most one direction letter
+            cut = len(data.rstrip(b'0123456789'))
+            if cut and data[cut - 1] in b'LRlr':
+                cut -= 1
+            carry = data[cut:]
+            for m in ROTATION_RE.finditer(data, 0, cut):
+                yield m.group(1).upper().decode(), int(m.group(2))
+    for m in ROTATION_RE.finditer(carry):
+        yield m.group(1).upper().decode(), int(m.group(2))
+
+def benchmark_tokenizer(filename, block_size=1 << 20):
+    """Report throughput (MB/s) of iter_rotations and parse_rotation_deltas."""
+    size_mb = os.path.getsize(filename) / (1024 * 1024)
+    
+    t0 = time.perf_counter()
+    count = sum(1 for _ in iter_rotations(filename, block_size))
+    elapsed = time.perf_counter() - t0
+    print(f"iter_rotations:        {count} rotations, "
+          f"{size_mb / elapsed:8.1f} MB/s")
+    
+    t0 = time.perf_counter()
+    with open(filename, 'rb') as f:
+        count = parse_rotation_deltas(f.read()).size
+    elapsed = time.perf_counter() - t0
+    print(f"parse_rotation_deltas: {count} rotations, "
+          f"{size_mb / elapsed:8.1f} MB/s")
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python solve.py inputfile")
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    flags = {a for a in sys.argv[1:] if a.startswith('--')}
+    
+    if '--verify' in flags:
+        verify_count_zeros()
         return
     
-    with open(sys.argv[1], 'rb') as f:
-        content = f.read().decode('latin-1')
-    
-    rotations = []
-    for line in content.split('\n'):
-        line = line.strip()
-        if not line:
-            continue
-        i = 0
-        while i < len(line):
-            if line[i].upper() in ('L', 'R'):
-                j = i + 1
-                while j < len(line) and line[j].isdigit():
-                    j += 1
-                if j > i + 1:
-                    rotations.append(f"{line[i].upper()}{line[i+1:j]}")
-                i = j
-            else:
-                i += 1
+    if '--bench' in flags and len(args) == 1:
+        benchmark_tokenizer(args[0])
+        return
+    
+    if len(args) != 1:
+        print("Usage: python solve.py inputfile [--vectorized [--verbose] | --parallel | --bench] | --verify")
+        return
+    
+    if '--parallel' in flags:
+        _, total = count_zeros_parallel(args[0])
+        print(f"\nPassword: {total}")
+        return
+    
+    if '--vectorized' in flags:
+        _, total = count_zeros_in_file(args[0], verbose='--verbose' in flags)
+        print(f"\nPassword: {total}")
+        return
     
     pos = 50
     total = 0
@@ -62,9 +367,7 @@ def main():
     
     print("\n" + "-" * 50)
     
-    for rot in rotations:
-        d = rot[0]
-        n = int(rot[1:])
+    for d, n in iter_rotations(args[0]):
         new_pos, zeros = count_zeros_in_rotation(pos, d, n)
         total += zeros
         marker = " (ZERO!)" if new_pos == 0 else ""
@@ -1,4 +1,6 @@
 #program that reads from a file named input.txt
+import sys
+from aocd22 import InvalidIdIndex, parse_ranges, normalize_ranges, sharded_brute_force
 
 def is_invalid_id(num):
     """
@@ -13,6 +15,40 @@ def is_invalid_id(num):
     half = length // 2
     return s[:half] == s[half:]
 
+def count_invalid_in_range(start, end):
+    """
+    Count and sum invalid IDs in [start, end] without visiting each ID.
+    Every doubled ID with 2L digits is p * (10^L + 1) for an L-digit p,
+    so for each half-length L the valid p form a contiguous block and
+    the sum is an arithmetic series. Cost is O(number of digit lengths).
+    """
+    count = 0
+    total = 0
+    half = 1
+    while True:
+        multiplier = 10 ** half + 1
+        p_min = 10 ** (half - 1)
+        if p_min * multiplier > end:
+            break
+        p_lo = max(p_min, -(-start // multiplier))
+        p_hi = min(10 ** half - 1, end // multiplier)
+        if p_lo <= p_hi:
+            n = p_hi - p_lo + 1
+            count += n
+            total += multiplier * (p_lo + p_hi) * n // 2
+        half += 1
+    return count, total
+
+def brute_force_in_range(start, end):
+    """Count and sum invalid IDs by checking every number (oracle)."""
+    count = 0
+    total = 0
+    for num in range(start, end + 1):
+        if is_invalid_id(num):
+            count += 1
+            total += num
+    return count, total
+
 def main():
     # Read input from file
     try:
@@ -22,25 +58,61 @@ def main():
         print("Error: input.txt not found in the current directory.")
         return
     
-    # Remove any whitespace or newlines and split by commas
-    # Handle the case where the input might have newlines for wrapping
-    input_str = input_str.replace('\n', '').replace('\r', '').strip()
-    
-    # Parse the ranges
-    ranges = []
-    for r in input_str.split(','):
-        r = r.strip()
-        if r and '-' in r:
-            try:
-                start, end = map(int, r.split('-'))
-                ranges.append((start, end))
-            except ValueError:
-                print(f"Warning: Skipping invalid range '{r}'")
+    # Parse the ranges (newlines from wrapping are removed)
+    ranges = parse_ranges(input_str, warn=True)
     
     if not ranges:
         print("No valid ranges found in input.")
         return
     
+    # --dedup counts IDs covered by overlapping ranges once
+    if '--dedup' in sys.argv:
+        ranges, skipped = normalize_ranges(ranges)
+        print(f"Merged into {len(ranges)} disjoint ranges, skipped {skipped:,} duplicate IDs")
+        print()
+    
+    if '--verify' in sys.argv:
+        for idx, (start, end) in enumerate(ranges, 1):
+            fast = count_invalid_in_range(start, end)
+            slow = brute_force_in_range(start, end)
+            status = "OK" if fast == slow else "MISMATCH"
+            print(f"Range {idx}: {start:,}-{end:,}  fast={fast} brute={slow}  {status}")
+        return
+    
+    if '--sharded' in sys.argv:
+        slow = sharded_brute_force(ranges, is_invalid_id)
+        fast = [0, 0]
+        for start, end in ranges:
+            count, range_sum = count_invalid_in_range(start, end)
+            fast[0] += count
+            fast[1] += range_sum
+        status = "OK" if tuple(fast) == slow else "MISMATCH"
+        print(f"fast={tuple(fast)} brute={slow}  {status}")
+        return
+    
+    index_path = next((a.split('=', 1)[1] for a in sys.argv[1:]
+                       if a.startswith('--index=')), None)
+    
+    if '--brute-force' not in sys.argv:
+        query = count_invalid_in_range
+        if index_path:
+            query = InvalidIdIndex.open(index_path, exactly_two=True,
+                                        fallback=count_invalid_in_range).query
+        total_count = 0
+        total_sum = 0
+        print("Invalid IDs found in each range:")
+        print("=" * 60)
+        for idx, (start, end) in enumerate(ranges, 1):
+            count, range_sum = query(start, end)
+            total_count += count
+            total_sum += range_sum
+            print(f"Range {idx}: {start:,}-{end:,}")
+            print(f"  Count: {count}, Sum: {range_sum:,}")
+        print("=" * 60)
+        print(f"TOTAL SUM OF ALL INVALID IDs: {total_sum:,}")
+        print(f"Found {total_count} invalid IDs total")
+        return
+    
     total_sum = 0
     
     print("Invalid IDs found in each range:")
@@ -1,4 +1,12 @@
 #!/usr/bin/env python3
+import os
+import sys
+import mmap
+import random
+import time
+from multiprocessing import Pool
+from array import array
+from bisect import bisect_left, bisect_right
 
 def is_invalid_id(num):
     s = str(num)
@@ -14,14 +22,251 @@ def is_invalid_id(num):
             return True
     return False
 
-def main():
-    try:
-        with open('input.txt', 'r') as file:
-            input_str = file.read().strip()
-    except FileNotFoundError:
-        print("Error: input.txt not found.")
-        return
+def mobius(n):
+    """Mobius function mu(n) by trial division."""
+    result = 1
+    p = 2
+    while p * p <= n:
+        if n % p == 0:
+            n //= p
+            if n % p == 0:
+                return 0
+            result = -result
+        p += 1
+    if n > 1:
+        result = -result
+    return result
+
+def _block_series(start, end, length, block, base=10):
+    """Count and sum length-digit numbers p * R in [start, end], where p
+    is any block-digit number and R = (base^length - 1) / (base^block - 1)."""
+    repunit = (base ** length - 1) // (base ** block - 1)
+    p_lo = max(base ** (block - 1), -(-start // repunit))
+    p_hi = min(base ** block - 1, end // repunit)
+    if p_lo > p_hi:
+        return 0, 0
+    n = p_hi - p_lo + 1
+    return n, repunit * (p_lo + p_hi) * n // 2
+
+def count_invalid_in_range(start, end):
+    """
+    Count and sum IDs in [start, end] made of a block repeated at least
+    twice, per digit length instead of per integer.
+    For an n-digit length, numbers with a period dividing n/d are
+    combined by Mobius inclusion-exclusion over divisors d > 1 of n, so
+    IDs matching several periods (like 111111) are counted once.
+    """
+    count = 0
+    total = 0
+    for length in range(max(len(str(start)), 2), len(str(end)) + 1):
+        lo = max(start, 10 ** (length - 1))
+        hi = min(end, 10 ** length - 1)
+        if lo > hi:
+            continue
+        for d in range(2, length + 1):
+            if length % d:
+                continue
+            mu = mobius(d)
+            if mu == 0:
+                continue
+            n, s = _block_series(lo, hi, length, length // d)
+            count -= mu * n
+            total -= mu * s
+    return count, total
+
+def _digit_length(num, base):
+    """Number of base-`base` digits in num (1 for 0)."""
+    length = 1
+    while num >= base:
+        num //= base
+        length += 1
+    return length
+
+def count_repeated_in_range(start, end, base=10, min_repeats=2, max_repeats=None):
+    """
+    General form of count_invalid_in_range: count and sum positive IDs in
+    [start, end] whose base-`base` digits are one block repeated r times
+    for some min_repeats <= r <= max_repeats (None = no upper bound).
+    
+    For an n-digit length, let A(m) be the numbers made of m repeats;
+    x in A(m) iff m divides x's largest repeat count q. The wanted set
+    is h(q) = [some allowed r divides q], so the weight of each A(m) is
+    c(m) = sum over d | m of mu(m/d) * h(d) (Mobius inversion over the
+    divisors of n), and each |A(m)| is an arithmetic series.
+    Raises ValueError for base < 2 or min_repeats < 1.
+    """
+    if base < 2:
+        raise ValueError(f"base must be at least 2 (got {base})")
+    if min_repeats < 1:
+        raise ValueError(f"min_repeats must be at least 1 (got {min_repeats})")
+    count = 0
+    total = 0
+    for length in range(_digit_length(max(start, 1), base), _digit_length(end, base) + 1):
+        lo = max(start, base ** (length - 1) if length > 1 else 1)
+        hi = min(end, base ** length - 1)
+        if lo > hi:
+            continue
+        upper = length if max_repeats is None else min(max_repeats, length)
+        divisors = [d for d in range(1, length + 1) if length % d == 0]
+        allowed = [r for r in divisors if min_repeats <= r <= upper]
+        if not allowed:
+            continue
+        for m in divisors:
+            weight = sum(mobius(m // d) for d in divisors
+                         if m % d == 0 and any(d % r == 0 for r in allowed))
+            if weight:
+                n, s = _block_series(lo, hi, length, length // m, base)
+                count += weight * n
+                total += weight * s
+    return count, total
+
+def benchmark_repeated_query(width=10 ** 12, queries=200, seed=0):
+    """Time count_repeated_in_range on random width-wide ranges."""
+    rng = random.Random(seed)
+    cases = [(10, 2, 2), (10, 2, None), (16, 2, None), (16, 3, 5), (2, 2, None)]
+    for base, k1, k2 in cases:
+        starts = [rng.randint(0, 10 ** 15) for _ in range(queries)]
+        t0 = time.perf_counter()
+        for start in starts:
+            count_repeated_in_range(start, start + width, base, k1, k2)
+        per_query = (time.perf_counter() - t0) / queries
+        print(f"base={base:2} repeats={k1}..{k2 or 'inf'}: "
+              f"{per_query * 1000:.3f} ms/query on {width:.0e}-wide ranges")
+
+def brute_force_in_range(start, end):
+    """Count and sum invalid IDs by checking every number (oracle)."""
+    count = 0
+    total = 0
+    for num in range(start, end + 1):
+        if is_invalid_id(num):
+            count += 1
+            total += num
+    return count, total
+
+def verify_against_brute_force(trials=2000, seed=0):
+    """Cross-check count_invalid_in_range against brute force."""
+    rng = random.Random(seed)
+    for _ in range(trials):
+        start = rng.randint(0, 10 ** rng.randint(1, 7))
+        end = start + rng.randint(0, 5000)
+        fast = count_invalid_in_range(start, end)
+        slow = brute_force_in_range(start, end)
+        if fast != slow:
+            print(f"MISMATCH {start}-{end}: fast={fast} brute={slow}")
+            return False
+    print(f"count_invalid_in_range matches brute force on {trials} ranges")
+    return True
+
+def generate_invalid_ids(limit, exactly_two=False):
+    """
+    Sorted list of every repeated-block ID <= limit.
+    exactly_two=True gives the aocd21 rule (a block repeated twice),
+    otherwise the aocd22 rule (a block repeated at least twice).
+    """
+    ids = []
+    for length in range(2, len(str(limit)) + 1):
+        if exactly_two:
+            if length % 2:
+                continue
+            blocks = [length // 2]
+        else:
+            blocks = [b for b in range(1, length // 2 + 1) if length % b == 0]
+        found = set()
+        for block in blocks:
+            repunit = (10 ** length - 1) // (10 ** block - 1)
+            p_hi = min(10 ** block - 1, limit // repunit)
+            found.update(p * repunit for p in range(10 ** (block - 1), p_hi + 1))
+        ids.extend(sorted(found))
+    return ids
+
+INDEX_MAGIC = 0x41434F4432494458  # marks the current InvalidIdIndex file layout
+
+class InvalidIdIndex:
+    """
+    Sorted index of repeated-block IDs with prefix sums, answering
+    count/sum queries with two bisects. Stored as one flat file of
+    uint64 values: [magic, limit, exactly_two, n, ids[0..n), prefix[0..n]],
+    and loaded via mmap so opening a saved index does not read it into
+    memory. Queries reaching above `limit` go to `fallback` (an arithmetic
+    engine such as count_invalid_in_range).
+    """
+    def __init__(self, limit, ids, prefix, exactly_two=False, fallback=count_invalid_in_range):
+        self.limit = limit
+        self.ids = ids
+        self.prefix = prefix
+        self.exactly_two = exactly_two
+        self.fallback = fallback
+    
+    @classmethod
+    def build(cls, limit=10 ** 12, exactly_two=False, fallback=count_invalid_in_range):
+        """Generate the IDs and prefix sums up to limit."""
+        ids = array('Q', generate_invalid_ids(limit, exactly_two))
+        prefix = array('Q', [0])
+        running = 0
+        for value in ids:
+            running += value
+            if running >= 1 << 64:
+                raise OverflowError(f"Prefix sums exceed uint64 below limit {limit}")
+            prefix.append(running)
+        return cls(limit, ids, prefix, exactly_two, fallback)
+    
+    def save(self, path):
+        """Write the index as a flat uint64 file."""
+        with open(path, 'wb') as f:
+            array('Q', [INDEX_MAGIC, self.limit, int(self.exactly_two), len(self.ids)]).tofile(f)
+            array('Q', self.ids).tofile(f)
+            array('Q', self.prefix).tofile(f)
+    
+    @classmethod
+    def load(cls, path, limit=10 ** 12, exactly_two=False, fallback=count_invalid_in_range):
+        """
+        Memory-map a file written by save(). Raises ValueError if the file
+        was built for a different rule or limit, or is truncated.
+        """
+        with open(path, 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(mapped) % 8:
+            mapped.close()
+            raise ValueError(f"Index '{path}' is not a whole number of uint64 values")
+        values = memoryview(mapped).cast('Q')
+        header = tuple(values[:4]) if len(values) >= 4 else ()
+        if header[:3] != (INDEX_MAGIC, limit, int(exactly_two)):
+            values.release()
+            mapped.close()
+            raise ValueError(f"Index '{path}' was not built for limit={limit}, "
+                             f"exactly_two={exactly_two}")
+        n = header[3]
+        count = len(values)
+        if count != 5 + 2 * n:
+            values.release()
+            mapped.close()
+            raise ValueError(f"Index '{path}' holds {count} values, expected {5 + 2 * n}")
+        return cls(limit, values[4:4 + n], values[4 + n:5 + 2 * n], exactly_two, fallback)
+    
+    @classmethod
+    def open(cls, path, limit=10 ** 12, exactly_two=False, fallback=count_invalid_in_range):
+        """Load the index at path, (re)building and saving it first if it is
+        missing or was built for another rule or limit."""
+        if os.path.exists(path):
+            try:
+                return cls.load(path, limit, exactly_two, fallback)
+            except ValueError:
+                pass
+        cls.build(limit, exactly_two).save(path)
+        return cls.load(path, limit, exactly_two, fallback)
     
+    def query(self, start, end):
+        """Return (count, sum) of invalid IDs in [start, end]."""
+        if start > end:
+            return 0, 0
+        if end > self.limit:
+            return self.fallback(start, end)
+        i = bisect_left(self.ids, start)
+        j = bisect_right(self.ids, end)
+        return j - i, self.prefix[j] - self.prefix[i]
+
+def parse_ranges(input_str, warn=False):
+    """Parse 'a-b,c-d,...' (newlines allowed) into a list of (start, end)."""
     input_str = input_str.replace('\n', '').replace('\r', '').strip()
     
     ranges = []
@@ -32,13 +277,114 @@ def main():
                 start, end = map(int, r.split('-'))
                 ranges.append((start, end))
             except ValueError:
-                continue
+                if warn:
+                    print(f"Warning: Skipping invalid range '{r}'")
+    return ranges
+
+def normalize_ranges(ranges):
+    """
+    Sort and merge overlapping ranges in O(r log r).
+    Returns (merged, skipped) where skipped is how many integers the raw
+    ranges would have visited more than once.
+    """
+    merged = []
+    for start, end in sorted(ranges):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    raw_width = sum(end - start + 1 for start, end in ranges)
+    merged_width = sum(end - start + 1 for start, end in merged)
+    return merged, raw_width - merged_width
+
+def _brute_force_block(task):
+    """Pool worker: count and sum invalid IDs in one block."""
+    is_invalid, start, end = task
+    count = 0
+    total = 0
+    for num in range(start, end + 1):
+        if is_invalid(num):
+            count += 1
+            total += num
+    return count, total
+
+def sharded_brute_force(ranges, is_invalid=is_invalid_id, block_size=1_000_000,
+                        workers=None, chunksize=4):
+    """
+    Brute-force oracle split across processes. Each (start, end) range is
+    cut into blocks of block_size IDs, checked with imap_unordered, and
+    the per-block counts and sums are reduced. Prints IDs/s throughput.
+    """
+    tasks = []
+    for start, end in ranges:
+        for lo in range(start, end + 1, block_size):
+            tasks.append((is_invalid, lo, min(lo + block_size - 1, end)))
+    checked = sum(end - start + 1 for start, end in ranges)
+    
+    count = 0
+    total = 0
+    t0 = time.perf_counter()
+    with Pool(workers) as pool:
+        for block_count, block_sum in pool.imap_unordered(_brute_force_block, tasks, chunksize):
+            count += block_count
+            total += block_sum
+    elapsed = time.perf_counter() - t0
+    
+    print(f"Checked {checked:,} IDs in {elapsed:.2f}s "
+          f"({checked / elapsed if elapsed else 0:,.0f} IDs/s)")
+    return count, total
+
+def main():
+    if '--verify' in sys.argv:
+        verify_against_brute_force()
+        return
+    
+    if '--bench' in sys.argv:
+        benchmark_repeated_query()
+        return
+    
+    index_path = next((a.split('=', 1)[1] for a in sys.argv[1:]
+                       if a.startswith('--index=')), None)
+    
+    try:
+        with open('input.txt', 'r') as file:
+            input_str = file.read().strip()
+    except FileNotFoundError:
+        print("Error: input.txt not found.")
+        return
+    
+    ranges = parse_ranges(input_str)
+    
+    # --dedup counts IDs covered by overlapping ranges once
+    if '--dedup' in sys.argv:
+        ranges, skipped = normalize_ranges(ranges)
+        print(f"Merged into {len(ranges)} disjoint ranges, skipped {skipped} duplicate IDs")
+    
+    if '--sharded' in sys.argv:
+        slow = sharded_brute_force(ranges)
+        fast = [0, 0]
+        for start, end in ranges:
+            count, range_sum = count_invalid_in_range(start, end)
+            fast[0] += count
+            fast[1] += range_sum
+        status = "OK" if tuple(fast) == slow else "MISMATCH"
+        print(f"fast={tuple(fast)} brute={slow}  {status}")
+        return
     
     total_sum = 0
-    for start, end in ranges:
-        for num in range(start, end + 1):
-            if is_invalid_id(num):
-                total_sum += num
+    if '--brute-force' in sys.argv:
+        for start, end in ranges:
+            for num in range(start, end + 1):
+                if is_invalid_id(num):
+                    total_sum += num
+    elif index_path:
+        index = InvalidIdIndex.open(index_path)
+        for start, end in ranges:
+            total_sum += index.query(start, end)[1]
+    else:
+        for start, end in ranges:
+            total_sum += count_invalid_in_range(start, end)[1]
     
     print(f"Total sum: {total_sum}")
 
@@ -5,12 +5,32 @@ Battery Joltage Calculator
 Select exactly two batteries (in their original order) to form largest two-digit number.
 """
 
+import random
+import time
+from aocd32 import load_banks_array, batch_best_pair
+
+
 def find_max_joltage(bank_str):
     """
     Find maximum joltage by selecting two batteries.
     When batteries at positions i and j are selected (i < j),
     the joltage is digit_i followed by digit_j.
+    
+    Linear time: the best tens digit is the largest digit before the
+    last position (its leftmost occurrence leaves the most choice), and
+    the units digit is the largest digit after it. Works on the raw
+    ASCII bytes, so both max() scans run in C.
     """
+    bank = bank_str.encode() if isinstance(bank_str, str) else bank_str
+    if len(bank) < 2:
+        return 0
+    tens = max(bank[:-1])
+    units = max(bank[bank.index(tens) + 1:])
+    return (tens - 48) * 10 + (units - 48)
+
+
+def _find_max_joltage_pairs(bank_str):
+    """Original O(n^2) all-pairs version, kept for benchmarking."""
     bank = [int(digit) for digit in bank_str]
     n = len(bank)
     max_joltage = 0
@@ -26,17 +46,59 @@ def find_max_joltage(bank_str):
     return max_joltage
 
 
+def benchmark_find_max_joltage(sizes=(100, 1000, 3000, 100000, 1000000), seed=0):
+    """Compare the linear and all-pairs versions on random banks."""
+    rng = random.Random(seed)
+    for n in sizes:
+        bank = bytes(rng.choice(b'123456789') for _ in range(n))
+        t0 = time.perf_counter()
+        fast = find_max_joltage(bank)
+        fast_time = time.perf_counter() - t0
+        line = "n={:>8}: linear {:9.3f} ms".format(n, fast_time * 1000)
+        if n <= 3000:
+            t0 = time.perf_counter()
+            slow = _find_max_joltage_pairs(bank.decode())
+            slow_time = time.perf_counter() - t0
+            line += ", all-pairs {:9.3f} ms{}".format(
+                slow_time * 1000, "" if slow == fast else "  MISMATCH")
+        print(line)
+
+
+def batch_main(input_file, verbose=False):
+    """NumPy batch mode for many equal-length banks: prints the total only
+    (plus one line per bank when verbose)."""
+    values = batch_best_pair(load_banks_array(input_file))
+    if verbose:
+        for idx, max_jolt in enumerate(values.tolist(), 1):
+            print("Bank {}: {}".format(idx, max_jolt))
+    total_joltage = int(values.sum())
+    print("Total: {}".format(total_joltage))
+    
+    with open("output3.txt", 'w') as f:
+        f.write(str(total_joltage))
+    
+    return total_joltage
+
+
 def main():
     import sys
     
-    if len(sys.argv) != 2:
-        print("Usage: {} <input_file>".format(sys.argv[0]))
+    if len(sys.argv) == 2 and sys.argv[1] == "--bench":
+        benchmark_find_max_joltage()
+        return
+    
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    if len(args) != 1:
+        print("Usage: {} <input_file> [--batch [--verbose]]".format(sys.argv[0]))
         sys.exit(1)
     
-    input_file = sys.argv[1]
+    input_file = args[0]
+    
+    if '--batch' in sys.argv:
+        return batch_main(input_file, '--verbose' in sys.argv)
     
     try:
-        with open(input_file, 'r') as f:
+        with open(input_file, 'rb') as f:
             banks = [line.strip() for line in f if line.strip()]
         
         total_joltage = 0
@@ -45,8 +107,9 @@ def main():
         print("Battery Bank Analysis:")
         print("-" * 60)
         
-        for idx, bank_str in enumerate(banks, 1):
-            max_jolt = find_max_joltage(bank_str)
+        for idx, bank in enumerate(banks, 1):
+            max_jolt = find_max_joltage(bank)
+            bank_str = bank.decode()
             total_joltage += max_jolt
             results.append((idx, bank_str, max_jolt))
             
@@ -1,9 +1,66 @@
 #!/usr/bin/env python3
+import os
 import sys
+import hashlib
+import numpy as np
+
+# Digits per int()/str() call; stays below CPython's 4300-digit limit
+DIGIT_CHUNK = 4000
+
+def digits_to_int(digits):
+    """ASCII digit bytes to int, in chunks so any length is accepted."""
+    value = 0
+    for i in range(0, len(digits), DIGIT_CHUNK):
+        chunk = digits[i:i + DIGIT_CHUNK]
+        value = value * 10 ** len(chunk) + int(chunk)
+    return value
+
+def int_to_digits(value):
+    """Decimal string of a non-negative int of any length (see digits_to_int)."""
+    base = 10 ** DIGIT_CHUNK
+    parts = []
+    while value >= base:
+        value, low = divmod(value, base)
+        parts.append(str(low).zfill(DIGIT_CHUNK))
+    parts.append(str(value))
+    return ''.join(reversed(parts))
+
+def format_joltage(value):
+    """Like '{:,}'.format(value), for ints of any length."""
+    digits = int_to_digits(value)
+    head = len(digits) % 3 or 3
+    return ','.join([digits[:head]] + [digits[i:i + 3] for i in range(head, len(digits), 3)])
+
+def max_subsequence(bank, k):
+    """
+    Largest k-digit number formed by picking k digits of bank in order.
+    Monotonic-stack greedy, O(n) for any k: a digit is popped while a
+    larger one arrives and there are still digits left to drop.
+    bank may be str or ASCII bytes; the result is an int built straight
+    from the selected bytes.
+    """
+    digits = bank.encode() if isinstance(bank, str) else bank
+    n = len(digits)
+    if not 0 < k <= n:
+        raise ValueError("k must be between 1 and {} (got {})".format(n, k))
+    
+    to_drop = n - k
+    stack = bytearray()
+    for d in digits:
+        while to_drop and stack and stack[-1] < d:
+            stack.pop()
+            to_drop -= 1
+        stack.append(d)
+    
+    return digits_to_int(stack[:k])
 
 def find_max_12_digits(bank_str):
+    """Largest 12-digit number (see max_subsequence)."""
+    return max_subsequence(bank_str, 12)
+
+def _find_max_12_digits_window(bank_str):
     """
-    Find largest 12-digit number by selecting 12 digits in order.
+    Original O(n*k) window scan, kept as a reference.
     Uses greedy algorithm: at each position, pick the largest digit
     while leaving enough digits for remaining positions.
     """
@@ -33,22 +90,174 @@ def find_max_12_digits(bank_str):
     # Convert list of digits to integer
     return int(''.join(str(d) for d in result))
 
+def load_banks_array(filename):
+    """Load equal-length banks as a 2D uint8 array of digit values."""
+    with open(filename, 'rb') as f:
+        lines = f.read().split()
+    if not lines:
+        return np.zeros((0, 0), dtype=np.uint8)
+    width = len(lines[0])
+    if any(len(line) != width for line in lines):
+        raise ValueError("Batch mode needs banks of equal length")
+    flat = np.frombuffer(b''.join(lines), dtype=np.uint8)
+    return flat.reshape(len(lines), width) - ord('0')
+
+def batch_best_pair(banks):
+    """Best two-digit joltage for every row, via a suffix max."""
+    if banks.shape[1] < 2:
+        return np.zeros(banks.shape[0], dtype=np.int64)
+    suffix_max = np.maximum.accumulate(banks[:, ::-1], axis=1)[:, ::-1]
+    pairs = banks[:, :-1].astype(np.int64) * 10 + suffix_max[:, 1:]
+    return pairs.max(axis=1)
+
+def batch_max_subsequence(banks, k):
+    """
+    Greedy k-digit selection for every row at once. Step i takes the
+    argmax (first occurrence) of each row over [start, n - k + i], with
+    earlier columns masked out; rows advance their own start.
+    Returns int64 values for k <= 18, Python ints otherwise.
+    """
+    rows, n = banks.shape
+    if not 0 < k <= n:
+        raise ValueError("k must be between 1 and {} (got {})".format(n, k))
+    
+    digits = banks.astype(np.int8)
+    columns = np.arange(n)
+    row_index = np.arange(rows)
+    start = np.zeros(rows, dtype=np.int64)
+    picked = np.empty((rows, k), dtype=np.uint8)
+    
+    for i in range(k):
+        end = n - k + i + 1
+        window = np.where(columns[:end] >= start[:, None], digits[:, :end], -1)
+        best = window.argmax(axis=1)
+        picked[:, i] = banks[row_index, best]
+        start = best + 1
+    
+    if k <= 18:
+        weights = 10 ** np.arange(k - 1, -1, -1, dtype=np.int64)
+        return picked.astype(np.int64) @ weights
+    return [digits_to_int((row + ord('0')).tobytes()) for row in picked]
+
+class BankIndex:
+    """
+    Sparse table over one bank for leftmost-argmax window queries.
+    Built once in O(n log n); each k-digit answer then takes k O(1)
+    window queries. Can be saved to / loaded from an .npz cache.
+    """
+    def __init__(self, digits, levels):
+        self.digits = digits
+        # levels[j][i]: offset from i of the leftmost argmax of
+        # digits[i:i + 2**j], in the narrowest dtype that holds 2**j - 1
+        self.levels = levels
+    
+    @classmethod
+    def build(cls, bank):
+        """Build the sparse table for a bank (str or ASCII bytes)."""
+        raw = bank.encode() if isinstance(bank, str) else bank
+        digits = np.frombuffer(raw, dtype=np.uint8) - ord('0')
+        n = len(digits)
+        prev = np.arange(n, dtype=np.int32)
+        levels = [np.zeros(n, dtype=np.uint8)]
+        span = 1
+        while 2 * span <= n:
+            left = prev[:n - 2 * span + 1]
+            right = prev[span:n - span + 1]
+            prev = np.where(digits[left] >= digits[right], left, right)
+            offsets = prev - np.arange(len(prev), dtype=np.int32)
+            levels.append(offsets.astype(np.min_scalar_type(2 * span - 1)))
+            span *= 2
+        return cls(digits, levels)
+    
+    @classmethod
+    def cached(cls, bank, cache_dir):
+        """Load the index for bank from cache_dir, building it if missing."""
+        raw = bank.encode() if isinstance(bank, str) else bank
+        path = os.path.join(cache_dir, hashlib.sha1(raw).hexdigest() + '.npz')
+        if os.path.exists(path):
+            return cls.load(path)
+        index = cls.build(raw)
+        os.makedirs(cache_dir, exist_ok=True)
+        index.save(path)
+        return index
+    
+    def save(self, path):
+        """Write digits and levels to a compressed .npz file."""
+        arrays = {'level_{}'.format(j): level for j, level in enumerate(self.levels)}
+        np.savez_compressed(path, digits=self.digits, **arrays)
+    
+    @classmethod
+    def load(cls, path):
+        """Read an index written by save()."""
+        with np.load(path) as data:
+            count = sum(1 for name in data.files if name.startswith('level_'))
+            return cls(data['digits'], [data['level_{}'.format(j)] for j in range(count)])
+    
+    def argmax(self, lo, hi):
+        """Leftmost position of the largest digit in digits[lo:hi + 1]."""
+        j = (hi - lo + 1).bit_length() - 1
+        level = self.levels[j]
+        a = lo + int(level[lo])
+        b = hi - (1 << j) + 1
+        b += int(level[b])
+        return a if self.digits[a] >= self.digits[b] else b
+    
+    def max_subsequence(self, k):
+        """Same result as max_subsequence(bank, k), in O(k) queries."""
+        n = len(self.digits)
+        if not 0 < k <= n:
+            raise ValueError("k must be between 1 and {} (got {})".format(n, k))
+        picked = bytearray()
+        start = 0
+        for i in range(k):
+            pos = self.argmax(start, n - k + i)
+            picked.append(int(self.digits[pos]) + ord('0'))
+            start = pos + 1
+        return digits_to_int(picked)
+
 def main():
-    if len(sys.argv) != 2:
-        print("Usage: python3 script.py <input_file>")
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    k = next((int(a[4:]) for a in sys.argv[1:] if a.startswith('--k=')), 12)
+    
+    if len(args) != 1:
+        print("Usage: python3 script.py <input_file> [--k=N] [--batch [--verbose]]"
+              " | [--ks=N,M,... [--cache=DIR]]")
         sys.exit(1)
     
-    with open(sys.argv[1], 'r') as f:
-        banks = [line.strip() for line in f if line.strip()]
+    ks = next((a[5:] for a in sys.argv[1:] if a.startswith('--ks=')), None)
+    if ks:
+        # Several selection sizes per bank, sharing one BankIndex each
+        ks = [int(x) for x in ks.split(',')]
+        cache_dir = next((a[8:] for a in sys.argv[1:] if a.startswith('--cache=')), None)
+        with open(args[0], 'rb') as f:
+            banks = [line.strip() for line in f if line.strip()]
+        totals = dict.fromkeys(ks, 0)
+        for bank in banks:
+            index = BankIndex.cached(bank, cache_dir) if cache_dir else BankIndex.build(bank)
+            for k in ks:
+                totals[k] += index.max_subsequence(k)
+        for k in ks:
+            print("Total output joltage ({} batteries): {}".format(k, format_joltage(totals[k])))
+        return totals
     
-    total = 0
-    for bank in banks:
-        total += find_max_12_digits(bank)
+    if '--batch' in sys.argv:
+        values = batch_max_subsequence(load_banks_array(args[0]), k)
+        if '--verbose' in sys.argv:
+            for idx, value in enumerate(values, 1):
+                print("Bank {}: {}".format(idx, int_to_digits(int(value))))
+        total = sum(int(v) for v in values)
+    else:
+        with open(args[0], 'rb') as f:
+            banks = [line.strip() for line in f if line.strip()]
+        
+        total = 0
+        for bank in banks:
+            total += max_subsequence(bank, k)
     
-    print("Total output joltage (12 batteries): {:,}".format(total))
+    print("Total output joltage ({} batteries): {}".format(k, format_joltage(total)))
     
     with open("output3_part2.txt", 'w') as f:
-        f.write(str(total))
+        f.write(int_to_digits(total))
     
     return total
 
@@ -1,72 +1,508 @@
-def main():
-    # Read input from file
+import os
+import sys
+import mmap
+import random
+import tracemalloc
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+
+
+def load_grid(filename):
+    """Read a rectangular grid into a 2D uint8 array of characters."""
+    with open(filename, 'rb') as file:
+        lines = [line.strip() for line in file if line.strip()]
+    if not lines:
+        return np.zeros((0, 0), dtype=np.uint8)
+    return np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(len(lines), len(lines[0]))
+
+
+def neighbour_counts(rolls):
+    """
+    Number of rolls among the 8 neighbours of every cell, computed at once
+    by summing shifted slices of a zero-padded copy of the boolean grid.
+    """
+    rows, cols = rolls.shape
+    padded = np.zeros((rows + 2, cols + 2), dtype=np.uint8)
+    padded[1:-1, 1:-1] = rolls
+    counts = np.zeros((rows, cols), dtype=np.uint8)
+    for dr in (0, 1, 2):
+        for dc in (0, 1, 2):
+            if dr != 1 or dc != 1:
+                counts += padded[dr:dr + rows, dc:dc + cols]
+    return counts
+
+
+def accessible_mask(rolls):
+    """Rolls with fewer than 4 adjacent rolls."""
+    return rolls & (neighbour_counts(rolls) < 4)
+
+
+def peel_rounds(rolls):
+    """
+    Worklist version of repeated removal (like a k-core peel). Neighbour
+    counts are computed once; each round removes the current frontier,
+    decrements the counts around it and queues only the neighbours that
+    dropped below 4. Yields the (rows, cols) index arrays removed in each
+    round, so the rounds match a full rescan per iteration.
+    
+    Small frontiers are decremented via np.unique over their neighbour
+    indices; once a frontier covers more than 1/64 of the grid, summing
+    shifted slices of a removal mask is cheaper than that sort.
+    """
+    rows, cols = rolls.shape
+    width = cols + 2
+    # Flattened, zero-padded layout: every interior cell has 8 neighbours
+    alive = np.zeros((rows + 2, width), dtype=bool)
+    alive[1:-1, 1:-1] = rolls
+    alive = alive.ravel()
+    counts = np.zeros((rows + 2, width), dtype=np.uint8)
+    counts[1:-1, 1:-1] = neighbour_counts(rolls)
+    counts = counts.ravel()
+    offsets = np.array([-width - 1, -width, -width + 1, -1, 1,
+                        width - 1, width, width + 1])
+    
+    inner = slice(width + 1, alive.size - width - 1)
+    
+    frontier = np.flatnonzero(alive & (counts < 4))
+    while frontier.size:
+        yield frontier // width - 1, frontier % width - 1
+        alive[frontier] = False
+        if frontier.size * 64 > alive.size:
+            removed = np.zeros(alive.size, dtype=bool)
+            removed[frontier] = True
+            hits = np.zeros(alive.size, dtype=np.uint8)
+            for offset in offsets:
+                hits[inner] += removed[inner.start - offset:inner.stop - offset]
+            counts -= hits
+            frontier = np.flatnonzero(alive & (hits > 0) & (counts < 4))
+        else:
+            neighbours = (frontier[:, None] + offsets).ravel()
+            candidates, hits = np.unique(neighbours, return_counts=True)
+            counts[candidates] -= hits.astype(np.uint8)
+            frontier = candidates[alive[candidates] & (counts[candidates] < 4)]
+
+
+def peel_depths(rolls):
+    """
+    Round in which each roll is removed by repeated removal (0 = never),
+    from a single peel_rounds pass. int16 unless there are more rounds
+    than int16 can hold.
+    """
+    depths = np.zeros(rolls.shape, dtype=np.int16)
+    for depth, (removed_rows, removed_cols) in enumerate(peel_rounds(rolls), 1):
+        if depth > np.iinfo(depths.dtype).max:
+            depths = depths.astype(np.int32)
+        depths[removed_rows, removed_cols] = depth
+    return depths
+
+
+def depth_histogram(depths):
+    """Rolls removed per round (index 0 = never removed)."""
+    return np.bincount(np.asarray(depths).ravel())
+
+
+ROLL_BITS = bytes.maketrans(b'@.x', b'100')
+
+
+def load_bitboard(filename):
+    """
+    Read a grid as one Python int per row (bit c set = roll in column c).
+    Returns (rows, cols); about one bit per cell instead of a list of
+    single-character strings.
+    """
+    rows = []
+    cols = 0
+    with open(filename, 'rb') as file:
+        for line in file:
+            line = line.strip()
+            if line:
+                cols = len(line)
+                rows.append(int(line.translate(ROLL_BITS)[::-1], 2))
+    return rows, cols
+
+
+def _row_accessible(above, row, below, full):
+    """
+    Bits of `row` that have fewer than 4 rolls among their 8 neighbours.
+    The 8 shifted neighbour rows are added bit-parallel with half adders
+    into a 2-bit counter plus a sticky ">= 4" bit.
+    """
+    b0 = b1 = at_least_4 = 0
+    for x in (above << 1, above, above >> 1, row << 1, row >> 1,
+              below << 1, below, below >> 1):
+        carry0 = b0 & x
+        b0 ^= x
+        carry1 = b1 & carry0
+        b1 ^= carry0
+        at_least_4 |= carry1
+    return row & ~at_least_4 & full
+
+
+def bitboard_accessible(rows, cols):
+    """Accessible-roll mask for every row of a bitboard."""
+    full = (1 << cols) - 1
+    padded = [0] + rows + [0]
+    return [_row_accessible(padded[i], padded[i + 1], padded[i + 2], full)
+            for i in range(len(rows))]
+
+
+def bitboard_peel_rounds(rows, cols):
+    """
+    Repeated removal on a bitboard, updating `rows` in place. Only rows
+    next to a row that changed are re-evaluated in the following round.
+    Yields the number of rolls removed per round.
+    """
+    full = (1 << cols) - 1
+    n = len(rows)
+    dirty = range(n)
+    while True:
+        removed = {}
+        for i in dirty:
+            above = rows[i - 1] if i > 0 else 0
+            below = rows[i + 1] if i + 1 < n else 0
+            mask = _row_accessible(above, rows[i], below, full)
+            if mask:
+                removed[i] = mask
+        if not removed:
+            return
+        for i, mask in removed.items():
+            rows[i] &= ~mask
+        yield sum(bin(mask).count('1') for mask in removed.values())
+        dirty = sorted({j for i in removed for j in (i - 1, i, i + 1) if 0 <= j < n})
+
+
+def bitboard_line(bits, cols, marks=0):
+    """Render one bitboard row as text ('x' for bits set in marks)."""
+    cells = format(bits, f'0{cols}b')[::-1]
+    marked = format(marks, f'0{cols}b')[::-1]
+    return ''.join('x' if m == '1' else '@' if b == '1' else '.'
+                   for b, m in zip(cells, marked))
+
+
+def benchmark_memory(rows=1000, cols=1000, seed=0):
+    """Peak memory of the list-of-lists, NumPy and bitboard grid forms."""
+    rng = random.Random(seed)
+    lines = [bytes(rng.choice(b'@.') for _ in range(cols)) for _ in range(rows)]
+    
+    def peak(build):
+        tracemalloc.start()
+        grid = build()
+        size = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del grid
+        return size
+    
+    forms = [
+        ("list of lists", lambda: [list(line.decode()) for line in lines]),
+        ("numpy uint8", lambda: np.frombuffer(b''.join(lines), dtype=np.uint8).reshape(rows, cols).copy()),
+        ("bitboard", lambda: [int(line.translate(ROLL_BITS)[::-1], 2) for line in lines]),
+    ]
+    print(f"Grid {rows}x{cols}:")
+    for name, build in forms:
+        size = peak(build)
+        print(f"  {name:14s} {size / 1e6:10.2f} MB  ({size / (rows * cols):6.2f} bytes/cell)")
+
+
+def grid_layout(filename):
+    """
+    (rows, cols, stride) of a rectangular grid file, where stride is the
+    byte length of one line including its newline. Used by the tiled
+    mode, which addresses rows by offset instead of reading the file.
+    Raises ValueError if the file size does not fit whole rows.
+    """
+    with open(filename, 'rb') as file:
+        first = file.readline()
+        file.seek(0, os.SEEK_END)
+        size = file.tell()
+        file.seek(max(size - 4096, 0))
+        tail = file.read()
+    if not first.endswith(b'\n'):
+        first += b'\n'
+    stride = len(first)
+    ending = stride - len(first.rstrip(b'\r\n'))
+    cols = len(first.rstrip())
+    # Trailing blank lines are ignored, as in load_grid
+    content_end = size - (len(tail) - len(tail.rstrip(b'\r\n')))
+    if cols == 0 or (content_end + ending) % stride:
+        raise ValueError(f"'{filename}' is not a grid of equal-length lines "
+                         f"({stride} bytes each)")
+    return (content_end + ending) // stride, cols, stride
+
+
+def read_rows(mapped, lo, hi, cols, stride):
+    """
+    Rows [lo, hi) of a mapped grid file as a 2D uint8 array. Raises
+    ValueError if a row does not end with a newline at byte stride - 1.
+    """
+    chunk = mapped[lo * stride:hi * stride].ljust((hi - lo) * stride, b'\n')
+    rows = np.frombuffer(chunk, dtype=np.uint8).reshape(hi - lo, stride)
+    misaligned = np.flatnonzero(rows[:, stride - 1] != ord('\n'))
+    if misaligned.size:
+        raise ValueError(f"Row {lo + misaligned[0]} is not {stride} bytes long; "
+                         "the tiled mode needs equal-length lines")
+    return rows[:, :cols]
+
+
+# Byte budget for one row band in the tiled modes; bands get as many
+# rows as fit, so worker memory does not grow with the grid width
+BAND_BYTES = 1 << 24
+
+
+def band_rows(cols, band_bytes=BAND_BYTES):
+    """Rows per band so that one band of cols bytes stays within band_bytes."""
+    return max(1, band_bytes // max(cols, 1))
+
+
+def _band_bounds(rows, band_rows):
+    return [(lo, min(lo + band_rows, rows)) for lo in range(0, rows, band_rows)]
+
+
+def _tile_accessible(task):
+    """
+    Pool worker: mark accessible rolls in rows [lo, hi) using one halo row
+    on each side, and write the marked rows into the output file.
+    """
+    filename, (rows, cols, stride), lo, hi, out_path, out_offset = task
+    with open(filename, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        top, bottom = max(lo - 1, 0), min(hi + 1, rows)
+        chars = read_rows(mapped, top, bottom, cols, stride).copy()
+        mapped.close()
+    
+    accessible = accessible_mask(chars == ord('@'))[lo - top:lo - top + hi - lo]
+    band = chars[lo - top:lo - top + hi - lo]
+    marked = np.where(accessible, np.uint8(ord('x')), band)
+    lines = np.hstack([marked, np.full((hi - lo, 1), ord('\n'), dtype=np.uint8)])
+    
+    with open(out_path, 'r+b') as out:
+        out.seek(out_offset + lo * (cols + 1))
+        out.write(lines.tobytes())
+    return int(np.count_nonzero(band == ord('@'))), int(np.count_nonzero(accessible))
+
+
+def tiled_accessible(filename, out_path='output4.txt', band_bytes=BAND_BYTES, workers=None):
+    """
+    Out-of-core version of the single pass: the input is memory-mapped
+    and split into row bands processed on a process pool, each writing
+    its part of the marked grid straight into out_path.
+    Returns (total_rolls, accessible_count).
+    """
+    layout = grid_layout(filename)
+    rows, cols, _ = layout
+    header = b"Grid with accessible rolls marked (x):\n"
+    with open(out_path, 'wb') as out:
+        out.write(header)
+        out.truncate(len(header) + rows * (cols + 1))
+    
+    tasks = [(filename, layout, lo, hi, out_path, len(header))
+             for lo, hi in _band_bounds(rows, band_rows(cols, band_bytes))]
+    total_rolls = 0
+    accessible_count = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for band_rolls, band_accessible in pool.map(_tile_accessible, tasks):
+            total_rolls += band_rolls
+            accessible_count += band_accessible
+    
+    with open(out_path, 'a') as out:
+        out.write(f"\nTotal rolls of paper (@): {total_rolls}\n")
+        out.write(f"Accessible rolls: {accessible_count}\n")
+    return total_rolls, accessible_count
+
+
+def _tile_peel(task):
+    """
+    Pool worker for one synchronous removal round on band b (rows [lo, hi))
+    of the state file. Halo rows are the neighbours' boundary rows from the
+    previous round, read from the `parity` half of the edges file; the
+    band's new boundary rows go to the other half. Returns the number
+    removed.
+    """
+    state_path, edges_path, (rows, cols, bands), b, lo, hi, parity = task
+    state = np.memmap(state_path, dtype=np.uint8, mode='r+', shape=(rows, cols))
+    edges = np.memmap(edges_path, dtype=np.uint8, mode='r+', shape=(2, bands, 2, cols))
+    band = np.array(state[lo:hi])
+    parts = [band]
+    if b > 0:
+        parts.insert(0, np.array(edges[parity, b - 1, 1])[None, :])
+    if b + 1 < bands:
+        parts.append(np.array(edges[parity, b + 1, 0])[None, :])
+    
+    offset = 1 if b > 0 else 0
+    accessible = accessible_mask(np.vstack(parts) == ord('@'))[offset:offset + hi - lo]
+    removed = int(np.count_nonzero(accessible))
+    if removed:
+        band[accessible] = ord('.')
+        state[lo:hi] = band
+        state.flush()
+    edges[1 - parity, b, 0] = band[0]
+    edges[1 - parity, b, 1] = band[-1]
+    edges.flush()
+    del state, edges
+    return removed
+
+
+def tiled_peel_rounds(filename, state_path, band_bytes=BAND_BYTES, workers=None):
+    """
+    Out-of-core repeated removal. The grid is copied band by band into a
+    (rows, cols) state file; each round runs every band that may change
+    on a process pool. Bands exchange only their boundary rows, kept in a
+    double-buffered edges file next to the state file, so neither the
+    workers nor this process hold more than one band at a time.
+    Yields the number of rolls removed per round, like peel_rounds.
+    """
+    rows, cols, stride = grid_layout(filename)
+    bands = _band_bounds(rows, band_rows(cols, band_bytes))
+    edges_path = state_path + '.edges'
+    state = np.memmap(state_path, dtype=np.uint8, mode='w+', shape=(rows, cols))
+    edges = np.memmap(edges_path, dtype=np.uint8, mode='w+', shape=(2, len(bands), 2, cols))
+    with open(filename, 'rb') as file:
+        mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        for b, (lo, hi) in enumerate(bands):
+            band = read_rows(mapped, lo, hi, cols, stride)
+            state[lo:hi] = band
+            edges[0, b, 0] = band[0]
+            edges[0, b, 1] = band[-1]
+        mapped.close()
+    state.flush()
+    edges.flush()
+    del state
+    
+    try:
+        active = set(range(len(bands)))
+        parity = 0
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            while active:
+                # Bands skipped this round keep their boundary rows
+                for b in range(len(bands)):
+                    if b not in active:
+                        edges[1 - parity, b] = edges[parity, b]
+                edges.flush()
+                order = sorted(active)
+                tasks = ((state_path, edges_path, (rows, cols, len(bands)),
+                          b, bands[b][0], bands[b][1], parity) for b in order)
+                
+                removed = 0
+                active = set()
+                for b, band_removed in zip(order, pool.map(_tile_peel, tasks)):
+                    if band_removed:
+                        removed += band_removed
+                        active.update(n for n in (b - 1, b, b + 1) if 0 <= n < len(bands))
+                if not removed:
+                    return
+                parity = 1 - parity
+                yield removed
+    finally:
+        del edges
+        if os.path.exists(edges_path):
+            os.remove(edges_path)
+
+
+def grid_lines(chars):
+    """Render a character array back into text rows."""
+    return [row.tobytes().decode() for row in chars]
+
+
+def bitboard_main():
+    """Single pass on the bitboard form (--bitboard)."""
     try:
-        with open('input4.txt', 'r') as file:
-            grid = [list(line.strip()) for line in file if line.strip()]
+        rows, cols = load_bitboard('input4.txt')
     except FileNotFoundError:
         print("Error: input4.txt not found in the current directory.")
         return
     
-    if not grid:
+    if not rows:
         print("The input file is empty.")
         return
     
-    rows = len(grid)
-    cols = len(grid[0])
+    accessible = bitboard_accessible(rows, cols)
+    total_rolls = sum(bin(row).count('1') for row in rows)
+    accessible_count = sum(bin(mask).count('1') for mask in accessible)
     
-    # Directions for 8 adjacent positions
-    directions = [(-1, -1), (-1, 0), (-1, 1),
-                  (0, -1),          (0, 1),
-                  (1, -1),  (1, 0),  (1, 1)]
+    print(f"Total rolls of paper (@): {total_rolls}")
+    print(f"Accessible rolls: {accessible_count}")
     
-    # Create a copy to mark accessible rolls
-    result_grid = [row[:] for row in grid]
-    accessible_count = 0
+    with open('output4.txt', 'w') as file:
+        file.write("Grid with accessible rolls marked (x):\n")
+        for row, mask in zip(rows, accessible):
+            file.write(bitboard_line(row, cols, mask) + '\n')
+        file.write(f"\nTotal rolls of paper (@): {total_rolls}\n")
+        file.write(f"Accessible rolls: {accessible_count}\n")
+
+
+def tiled_main():
+    """
+    Out-of-core single pass on row bands (--tiled). Returns False if the
+    file is not laid out in equal-length lines, so the caller can fall
+    back to the in-memory path.
+    """
+    if not os.path.exists('input4.txt'):
+        print("Error: input4.txt not found in the current directory.")
+        return True
     
-    # Check each position in the grid
-    for r in range(rows):
-        for c in range(cols):
-            if grid[r][c] == '@':
-                # Count adjacent rolls
-                adjacent_count = 0
-                for dr, dc in directions:
-                    nr, nc = r + dr, c + dc
-                    if 0 <= nr < rows and 0 <= nc < cols:
-                        if grid[nr][nc] == '@':
-                            adjacent_count += 1
-                
-                # Check if accessible (fewer than 4 adjacent rolls)
-                if adjacent_count < 4:
-                    result_grid[r][c] = 'x'  # Mark as accessible
-                    accessible_count += 1
-                else:
-                    result_grid[r][c] = '@'  # Keep as original
+    try:
+        total_rolls, accessible_count = tiled_accessible('input4.txt')
+    except ValueError as e:
+        print(f"Warning: {e}; falling back to in-memory mode")
+        return False
+    print(f"Total rolls of paper (@): {total_rolls}")
+    print(f"Accessible rolls: {accessible_count}")
+    return True
+
+
+def main():
+    if '--tiled' in sys.argv and tiled_main():
+        return
+    
+    if '--bench-memory' in sys.argv:
+        benchmark_memory()
+        return
+    
+    if '--bitboard' in sys.argv:
+        bitboard_main()
+        return
+    
+    # Read input from file
+    try:
+        grid = load_grid('input4.txt')
+    except FileNotFoundError:
+        print("Error: input4.txt not found in the current directory.")
+        return
+    
+    if grid.size == 0:
+        print("The input file is empty.")
+        return
+    
+    rolls = grid == ord('@')
+    
+    # Mark accessible rolls (fewer than 4 adjacent rolls) with 'x'
+    accessible = accessible_mask(rolls)
+    result_grid = np.where(accessible, np.uint8(ord('x')), grid)
+    accessible_count = int(np.count_nonzero(accessible))
+    total_rolls = int(np.count_nonzero(rolls))
     
     # Print results
     print("Original grid:")
-    for row in grid:
-        print(''.join(row))
+    for row in grid_lines(grid):
+        print(row)
     
     print(f"\nGrid with accessible rolls marked (x):")
-    for row in result_grid:
-        print(''.join(row))
+    for row in grid_lines(result_grid):
+        print(row)
     
-    print(f"\nTotal rolls of paper (@): {sum(row.count('@') for row in grid)}")
+    print(f"\nTotal rolls of paper (@): {total_rolls}")
     print(f"Accessible rolls: {accessible_count}")
     
     # Show positions of accessible rolls
     print("\nPositions of accessible rolls (row, column, 0-indexed):")
-    for r in range(rows):
-        for c in range(cols):
-            if result_grid[r][c] == 'x':
-                print(f"({r}, {c})")
+    for r, c in np.argwhere(result_grid == ord('x')).tolist():
+        print(f"({r}, {c})")
     
     # Write output to file
     with open('output4.txt', 'w') as file:
         file.write("Grid with accessible rolls marked (x):\n")
-        for row in result_grid:
-            file.write(''.join(row) + '\n')
-        file.write(f"\nTotal rolls of paper (@): {sum(row.count('@') for row in grid)}\n")
+        for row in grid_lines(result_grid):
+            file.write(row + '\n')
+        file.write(f"\nTotal rolls of paper (@): {total_rolls}\n")
         file.write(f"Accessible rolls: {accessible_count}\n")
     
     print("\nResults have also been written to 'output4.txt'")
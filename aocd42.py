@@ -1,85 +1,203 @@
-def main():
-    # Read input from file
+import os
+import sys
+import numpy as np
+from aocd41 import (load_grid, peel_depths, depth_histogram, grid_lines, load_bitboard,
+                    bitboard_peel_rounds, bitboard_line, grid_layout,
+                    tiled_peel_rounds, band_rows)
+
+
+def bitboard_main():
+    """Iterated removal on the bitboard form (--bitboard)."""
     try:
-        with open('input4.txt', 'r') as file:
-            grid = [list(line.strip()) for line in file if line.strip()]
+        rows, cols = load_bitboard('input4.txt')
     except FileNotFoundError:
         print("Error: input4.txt not found in the current directory.")
         return
     
-    if not grid:
+    if not rows:
         print("The input file is empty.")
         return
     
-    rows = len(grid)
-    cols = len(grid[0])
+    original_rolls = sum(bin(row).count('1') for row in rows)
+    total_removed = 0
+    iteration = 1
+    
+    for removed_this_iteration in bitboard_peel_rounds(rows, cols):
+        total_removed += removed_this_iteration
+        print(f"Iteration {iteration}: Removed {removed_this_iteration} rolls")
+        iteration += 1
+    
+    remaining_rolls = original_rolls - total_removed
     
-    # Directions for 8 adjacent positions
-    directions = [(-1, -1), (-1, 0), (-1, 1),
-                  (0, -1),          (0, 1),
-                  (1, -1),  (1, 0),  (1, 1)]
+    print(f"\nTotal iterations: {iteration-1}")
+    print(f"Total rolls in original grid: {original_rolls}")
+    print(f"Total rolls removed: {total_removed}")
+    print(f"Rolls remaining: {remaining_rolls}")
     
-    # Create a working copy
-    working_grid = [row[:] for row in grid]
+    with open('output4.txt', 'w') as file:
+        file.write(f"Total rolls in original grid: {original_rolls}\n")
+        file.write(f"Total rolls removed: {total_removed}\n")
+        file.write(f"Rolls remaining: {remaining_rolls}\n")
+        file.write(f"Total iterations: {iteration-1}\n")
+        file.write("\nFinal state:\n")
+        for row in rows:
+            file.write(bitboard_line(row, cols) + '\n')
+    
+    print("\nResults have been written to 'output4.txt'")
+
+
+DEPTH_FILE = 'output4_depth.npy'
+
+
+def discard_depth_map(path=DEPTH_FILE):
+    """Remove a depth map left by an earlier run so it is not read as current."""
+    if os.path.exists(path):
+        os.remove(path)
+        print(f"Removed stale depth map '{path}'")
+
+
+def print_depth_histogram(path=DEPTH_FILE):
+    """Summarize a saved depth map without re-running the removal."""
+    try:
+        depths = np.load(path, mmap_mode='r')
+    except FileNotFoundError:
+        print(f"Error: {path} not found; run aocd42.py without --tiled/--bitboard first.")
+        return
+    
+    counts = depth_histogram(depths)
+    print(f"Depth map {depths.shape[0]}x{depths.shape[1]} from '{path}'")
+    print(f"Depth 0 (empty or never removed): {counts[0] if counts.size else 0}")
+    for depth, count in enumerate(counts[1:].tolist(), 1):
+        print(f"Round {depth:4}: {count}")
+
+
+def tiled_main():
+    """
+    Out-of-core iterated removal on row bands (--tiled). Returns False if
+    the file is not laid out in equal-length lines, so the caller can
+    fall back to the in-memory path.
+    """
+    if not os.path.exists('input4.txt'):
+        print("Error: input4.txt not found in the current directory.")
+        return True
+    
+    state_path = 'output4.state'
     total_removed = 0
-    iteration = 0
+    iteration = 1
     
-    while True:
-        iteration += 1
-        # Find all accessible rolls in current state
-        accessible_positions = []
-        
-        for r in range(rows):
-            for c in range(cols):
-                if working_grid[r][c] == '@':
-                    # Count adjacent rolls
-                    adjacent_count = 0
-                    for dr, dc in directions:
-                        nr, nc = r + dr, c + dc
-                        if 0 <= nr < rows and 0 <= nc < cols:
-                            if working_grid[nr][nc] == '@':
-                                adjacent_count += 1
-                    
-                    # Check if accessible (fewer than 4 adjacent rolls)
-                    if adjacent_count < 4:
-                        accessible_positions.append((r, c))
+    try:
+        try:
+            rows, cols, _ = grid_layout('input4.txt')
+            for removed_this_iteration in tiled_peel_rounds('input4.txt', state_path):
+                total_removed += removed_this_iteration
+                print(f"Iteration {iteration}: Removed {removed_this_iteration} rolls")
+                iteration += 1
+        except ValueError as e:
+            # Layout errors surface while the grid is copied, before any round
+            print(f"Warning: {e}; falling back to in-memory mode")
+            return False
         
-        # If no accessible rolls, we're done
-        if not accessible_positions:
-            break
+        # Stream the final state out of the state file
+        state = np.memmap(state_path, dtype=np.uint8, mode='r', shape=(rows, cols))
+        step = band_rows(cols)
+        remaining_rolls = sum(int(np.count_nonzero(state[lo:lo + step] == ord('@')))
+                              for lo in range(0, rows, step))
+        original_rolls = remaining_rolls + total_removed
         
-        # Remove accessible rolls (mark them as '.')
-        removed_this_iteration = len(accessible_positions)
-        for r, c in accessible_positions:
-            working_grid[r][c] = '.'
+        print(f"\nTotal iterations: {iteration-1}")
+        print(f"Total rolls in original grid: {original_rolls}")
+        print(f"Total rolls removed: {total_removed}")
+        print(f"Rolls remaining: {remaining_rolls}")
         
+        with open('output4.txt', 'w') as file:
+            file.write(f"Total rolls in original grid: {original_rolls}\n")
+            file.write(f"Total rolls removed: {total_removed}\n")
+            file.write(f"Rolls remaining: {remaining_rolls}\n")
+            file.write(f"Total iterations: {iteration-1}\n")
+            file.write("\nFinal state:\n")
+            for lo in range(0, rows, step):
+                for row in grid_lines(state[lo:lo + step]):
+                    file.write(row + '\n')
+        del state
+    finally:
+        if os.path.exists(state_path):
+            os.remove(state_path)
+    
+    print("\nResults have been written to 'output4.txt'")
+    return True
+
+
+def main():
+    if '--depth-histogram' in sys.argv:
+        print_depth_histogram()
+        return
+    
+    if '--tiled' in sys.argv or '--bitboard' in sys.argv:
+        # Only the in-memory path builds a depth map
+        discard_depth_map()
+    
+    if '--tiled' in sys.argv and tiled_main():
+        return
+    
+    if '--bitboard' in sys.argv:
+        bitboard_main()
+        return
+    
+    # Read input from file
+    try:
+        grid = load_grid('input4.txt')
+    except FileNotFoundError:
+        print("Error: input4.txt not found in the current directory.")
+        return
+    
+    if grid.size == 0:
+        print("The input file is empty.")
+        return
+    
+    # Round in which each roll is removed (0 = never), in one worklist pass
+    rolls = grid == ord('@')
+    depths = peel_depths(rolls)
+    np.save(DEPTH_FILE, depths)
+    
+    # Remove accessible rolls (mark them as '.')
+    working_grid = grid.copy()
+    working_grid[depths > 0] = ord('.')
+    total_removed = 0
+    iteration = 1
+    
+    for removed_this_iteration in depth_histogram(depths)[1:].tolist():
         total_removed += removed_this_iteration
         
         # Optional: print progress
         print(f"Iteration {iteration}: Removed {removed_this_iteration} rolls")
+        iteration += 1
+    
+    original_rolls = int(np.count_nonzero(rolls))
+    remaining_rolls = int(np.count_nonzero(working_grid == ord('@')))
     
     # Final results
     print(f"\nTotal iterations: {iteration-1}")
-    print(f"Total rolls in original grid: {sum(row.count('@') for row in grid)}")
+    print(f"Total rolls in original grid: {original_rolls}")
     print(f"Total rolls removed: {total_removed}")
-    print(f"Rolls remaining: {sum(row.count('@') for row in working_grid)}")
+    print(f"Rolls remaining: {remaining_rolls}")
     
     # Show final state
     print("\nFinal state:")
-    for row in working_grid:
-        print(''.join(row))
+    for row in grid_lines(working_grid):
+        print(row)
     
     # Write results to file
     with open('output4.txt', 'w') as file:
-        file.write(f"Total rolls in original grid: {sum(row.count('@') for row in grid)}\n")
+        file.write(f"Total rolls in original grid: {original_rolls}\n")
         file.write(f"Total rolls removed: {total_removed}\n")
-        file.write(f"Rolls remaining: {sum(row.count('@') for row in working_grid)}\n")
+        file.write(f"Rolls remaining: {remaining_rolls}\n")
         file.write(f"Total iterations: {iteration-1}\n")
         file.write("\nFinal state:\n")
-        for row in working_grid:
-            file.write(''.join(row) + '\n')
+        for row in grid_lines(working_grid):
+            file.write(row + '\n')
     
     print("\nResults have been written to 'output4.txt'")
+    print(f"Removal depth map has been written to '{DEPTH_FILE}'")
 
 if __name__ == "__main__":
     main()
@@ -1,40 +1,144 @@
+import sys
+import random
+import time
+import numpy as np
+from bisect import bisect_left
+from aocd52 import IntervalIndex, open_input, read_ranges, iter_id_chunks
+
+
+def parse_ids_array(text):
+    """
+    Parse whitespace-separated IDs straight into a NumPy array.
+    int64 when everything fits, else uint64, else an object array of
+    Python ints (np.fromstring saturates, so hitting the dtype maximum
+    triggers a re-parse with the next wider type).
+    """
+    ids = np.fromstring(text, dtype=np.int64, sep=' ')
+    if not ids.size or ids.max() < np.iinfo(np.int64).max:
+        return ids
+    try:
+        ids = np.fromstring(text, dtype=np.uint64, sep=' ')
+        if ids.max() < np.iinfo(np.uint64).max:
+            return ids
+    except ValueError:  # negative and huge IDs mixed
+        pass
+    return np.array([int(token) for token in text.split()], dtype=object)
+
+
+def bulk_fresh_mask(index, ids):
+    """
+    Fresh mask for an array of IDs: one searchsorted against the merged
+    range starts, then a comparison against the matching ends. Ranges and
+    IDs are brought to a common dtype (int64, uint64 or object) first;
+    the range arrays come from index.as_arrays, so they are built once
+    per index rather than once per call.
+    """
+    dtypes = [np.int64, np.uint64, object]
+    first = dtypes.index(ids.dtype) if ids.dtype != object else 2
+    for dtype in dtypes[first:]:
+        if dtype is np.uint64 and ids.dtype == np.int64 and ids.size and ids.min() < 0:
+            continue
+        bounds = index.as_arrays(dtype)
+        if bounds is None:
+            continue
+        starts, ends = bounds
+        ids = ids.astype(dtype, copy=False)
+        break
+    
+    if not len(starts):
+        return np.zeros(len(ids), dtype=bool)
+    pos = np.searchsorted(starts, ids, side='right') - 1
+    return (pos >= 0) & (ids <= ends[np.maximum(pos, 0)])
+
+
+def sweep_sorted_ids(index, ids):
+    """
+    Merge-join of ascending IDs against the merged ranges with two
+    pointers: one pass, no per-ID search. Also counts hits per merged
+    range. An ID smaller than its predecessor is detected and the range
+    pointer is repositioned with bisect, so unsorted input stays correct.
+    Returns (fresh_count, hits_per_range, was_sorted).
+    """
+    starts, ends = index.starts, index.ends
+    hits = [0] * len(starts)
+    fresh_count = 0
+    was_sorted = True
+    previous = None
+    i = 0
+    
+    for ingredient_id in ids:
+        if previous is not None and ingredient_id < previous:
+            was_sorted = False
+            i = bisect_left(ends, ingredient_id)
+        previous = ingredient_id
+        while i < len(ends) and ends[i] < ingredient_id:
+            i += 1
+        if i < len(starts) and starts[i] <= ingredient_id:
+            hits[i] += 1
+            fresh_count += 1
+    
+    return fresh_count, hits, was_sorted
+
+
+def benchmark_index(num_ranges=2000, num_ids=20000, seed=0):
+    """Compare IntervalIndex lookups with the any() scan over raw ranges."""
+    rng = random.Random(seed)
+    ranges = []
+    for _ in range(num_ranges):
+        start = rng.randint(0, 10 ** 12)
+        ranges.append((start, start + rng.randint(0, 10 ** 8)))
+    ids = [rng.randint(0, 10 ** 12) for _ in range(num_ids)]
+    
+    t0 = time.perf_counter()
+    index = IntervalIndex(ranges)
+    indexed = sum(1 for ingredient_id in ids if ingredient_id in index)
+    index_time = time.perf_counter() - t0
+    
+    t0 = time.perf_counter()
+    scanned = sum(1 for ingredient_id in ids
+                  if any(start <= ingredient_id <= end for start, end in ranges))
+    scan_time = time.perf_counter() - t0
+    
+    print(f"{num_ranges} ranges, {num_ids} IDs")
+    print(f"IntervalIndex (incl. build): {index_time:.4f}s, fresh={indexed}")
+    print(f"any() scan:                  {scan_time:.4f}s, fresh={scanned}")
+
+
 def main():
-    with open('input5.txt', 'r') as file:
-        content = file.read().strip()
-    
-    # Split content into two parts
-    parts = content.split('\n\n')
-    
-    # If file doesn't have a blank line separator
-    if len(parts) < 2:
-        lines = [line for line in content.split('\n') if line.strip()]
-        # Find where ranges end and IDs begin
-        separator_index = 0
-        for i, line in enumerate(lines):
-            if '-' not in line:
-                separator_index = i
-                break
+    if '--bench' in sys.argv:
+        benchmark_index()
+        return
+    
+    args = [a for a in sys.argv[1:] if not a.startswith('--')]
+    path = args[0] if args else 'input5.txt'
+    
+    # Stream the file: build the index from the range section, then
+    # check the IDs chunk by chunk ('-' reads from stdin)
+    with open_input(path) as file:
+        ranges, first_id = read_ranges(file)
+        index = IntervalIndex(ranges)
         
-        ranges = lines[:separator_index]
-        ids = lines[separator_index:]
-    else:
-        ranges = parts[0].split('\n')
-        ids = parts[1].split('\n')
-    
-    # Parse ranges
-    parsed_ranges = []
-    for r in ranges:
-        if '-' in r:
-            start, end = map(int, r.split('-'))
-            parsed_ranges.append((start, end))
-    
-    # Count fresh ingredients
-    fresh_count = 0
-    for id_str in ids:
-        if id_str:
-            ingredient_id = int(id_str)
-            if any(start <= ingredient_id <= end for start, end in parsed_ranges):
-                fresh_count += 1
+        if '--sorted' in sys.argv:
+            ids = (int(id_str) for chunk in iter_id_chunks(file, first_id) for id_str in chunk)
+            fresh_count, hits, was_sorted = sweep_sorted_ids(index, ids)
+            if not was_sorted:
+                print("Note: IDs were not sorted; out-of-order IDs were looked up with bisect")
+            print("IDs per merged range:")
+            for (start, end), count in zip(index, hits):
+                print(f"  {start}-{end}: {count}")
+            print(f"Number of fresh ingredient IDs: {fresh_count}")
+            return
+        
+        fresh_count = 0
+        for chunk in iter_id_chunks(file, first_id):
+            if '--bulk' in sys.argv:
+                fresh = bulk_fresh_mask(index, parse_ids_array('\n'.join(chunk)))
+                fresh_count += int(np.count_nonzero(fresh))
+            else:
+                # Count fresh ingredients
+                for id_str in chunk:
+                    if int(id_str) in index:
+                        fresh_count += 1
     
     print(f"Number of fresh ingredient IDs: {fresh_count}")
 
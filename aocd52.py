@@ -1,26 +1,15 @@
-def main():
-    with open('input5.txt', 'r') as file:
-        content = file.read().strip()
-    
-    # Get only the ranges part (before blank line)
-    parts = content.split('\n\n')
-    if len(parts) < 2:
-        # If no blank line, take all lines with dashes as ranges
-        ranges_text = content
-    else:
-        ranges_text = parts[0]
-    
-    # Parse ranges
-    ranges = []
-    for line in ranges_text.split('\n'):
-        if '-' in line:
-            start, end = map(int, line.strip().split('-'))
-            ranges.append((start, end))
-    
-    # Sort ranges by start value
-    ranges.sort(key=lambda x: x[0])
+import sys
+from array import array
+from bisect import bisect_left, bisect_right
+from contextlib import nullcontext
+from itertools import chain, islice
+import numpy as np
+
+
+def merge_ranges(ranges):
+    """Sort ranges by start and merge overlapping or adjacent ones."""
+    ranges = sorted(ranges, key=lambda x: x[0])
     
-    # Merge overlapping ranges
     merged = []
     if ranges:
         current_start, current_end = ranges[0]
@@ -34,8 +23,172 @@ def main():
         
         merged.append((current_start, current_end))
     
+    return merged
+
+
+class MergedRanges:
+    """
+    Shared read side of IntervalIndex and DynamicIntervalSet: merged
+    ranges held as sorted `starts` / `ends` sequences plus the covered-ID
+    count in `_total`.
+    """
+    def __len__(self):
+        return len(self.starts)
+    
+    def __iter__(self):
+        return zip(self.starts, self.ends)
+    
+    def __contains__(self, ingredient_id):
+        i = bisect_right(self.starts, ingredient_id) - 1
+        return i >= 0 and ingredient_id <= self.ends[i]
+    
+    @property
+    def total(self):
+        """Number of IDs covered by the ranges."""
+        return self._total
+
+
+class IntervalIndex(MergedRanges):
+    """
+    Merged fresh ranges stored as two compact sorted arrays (starts, ends).
+    Membership is a single bisect, O(log r) per ID.
+    """
+    def __init__(self, ranges):
+        merged = merge_ranges(ranges)
+        starts = [start for start, _ in merged]
+        ends = [end for _, end in merged]
+        try:
+            self.starts = array('Q', starts)
+            self.ends = array('Q', ends)
+        except OverflowError:
+            # IDs beyond uint64 (or negative): keep plain lists
+            self.starts = starts
+            self.ends = ends
+        self._total = sum(end - start + 1 for start, end in merged)
+        self._arrays = {}
+    
+    def as_arrays(self, dtype):
+        """
+        (starts, ends) as NumPy arrays of dtype, converted once per dtype.
+        Returns None if the bounds do not fit in dtype.
+        """
+        key = np.dtype(dtype)
+        if key not in self._arrays:
+            try:
+                self._arrays[key] = (np.array(list(self.starts), dtype=dtype),
+                                     np.array(list(self.ends), dtype=dtype))
+            except OverflowError:
+                self._arrays[key] = None
+        return self._arrays[key]
+
+
+class DynamicIntervalSet(MergedRanges):
+    """
+    Fresh ranges that change over time. Keeps the same merged form as
+    merge_ranges (sorted, disjoint, non-adjacent) in two sorted lists and
+    updates the covered-ID total on every change, so neither the total
+    (as printed by aocd52) nor point queries (as in aocd51) need a rebuild.
+    
+    Each update finds the affected ranges with bisect (O(log n)) and
+    splices them in one list slice assignment.
+    """
+    def __init__(self, ranges=()):
+        self.starts = []
+        self.ends = []
+        self._total = 0
+        for start, end in merge_ranges(ranges):
+            self.starts.append(start)
+            self.ends.append(end)
+            self._total += end - start + 1
+    
+    def _splice(self, i, j, pieces):
+        """Replace ranges i..j-1 with pieces, keeping total up to date."""
+        self._total -= sum(self.ends[k] - self.starts[k] + 1 for k in range(i, j))
+        self._total += sum(end - start + 1 for start, end in pieces)
+        self.starts[i:j] = [start for start, _ in pieces]
+        self.ends[i:j] = [end for _, end in pieces]
+    
+    def insert_range(self, start, end):
+        """Mark [start, end] fresh, merging with touching ranges."""
+        if start > end:
+            return
+        i = bisect_left(self.ends, start - 1)    # first range ending at/after start - 1
+        j = bisect_right(self.starts, end + 1)   # ranges starting at/before end + 1
+        if i < j:
+            start = min(start, self.starts[i])
+            end = max(end, self.ends[j - 1])
+        self._splice(i, j, [(start, end)])
+    
+    def remove_range(self, start, end):
+        """Mark [start, end] no longer fresh, splitting ranges as needed."""
+        if start > end:
+            return
+        i = bisect_left(self.ends, start)
+        j = bisect_right(self.starts, end)
+        if i >= j:
+            return
+        pieces = []
+        if self.starts[i] < start:
+            pieces.append((self.starts[i], start - 1))
+        if self.ends[j - 1] > end:
+            pieces.append((end + 1, self.ends[j - 1]))
+        self._splice(i, j, pieces)
+
+
+def open_input(path='input5.txt'):
+    """Open the puzzle input for streaming; '-' reads from stdin."""
+    if path == '-':
+        return nullcontext(sys.stdin)
+    return open(path, 'r')
+
+
+def read_ranges(lines):
+    """
+    Consume the range section from an iterator of lines, stopping at the
+    blank separator line or at the first line without a '-'.
+    Returns (ranges, first_id_line); first_id_line is None if the
+    section ended on a blank line or at end of input.
+    """
+    ranges = []
+    for line in lines:
+        line = line.strip()
+        if not line:
+            if ranges:
+                return ranges, None
+            continue
+        if '-' not in line:
+            return ranges, line
+        start, end = map(int, line.split('-'))
+        ranges.append((start, end))
+    return ranges, None
+
+
+def iter_id_chunks(lines, first=None, chunk_lines=1 << 16):
+    """Yield the remaining non-blank ID lines in lists of up to chunk_lines."""
+    if first is not None:
+        lines = chain([first], lines)
+    while True:
+        block = list(islice(lines, chunk_lines))
+        if not block:
+            return
+        chunk = [line.strip() for line in block if line.strip()]
+        if chunk:
+            yield chunk
+
+
+def main():
+    path = sys.argv[1] if len(sys.argv) > 1 else 'input5.txt'
+    
+    # Only the range section is read; the ID lines are never loaded
+    with open_input(path) as file:
+        ranges, _ = read_ranges(file)
+    
+    # Sort and merge overlapping ranges
+    index = IntervalIndex(ranges)
+    merged = list(index)
+    
     # Count total IDs
-    total_fresh = sum(end - start + 1 for start, end in merged)
+    total_fresh = index.total
     
     print(f"Number of fresh ingredient IDs according to ranges: {total_fresh}")
     